@@ -27,27 +27,130 @@ FAISS_INDEX_DIR.mkdir(parents=True, exist_ok=True)
 # Embedding model: converts text → 384-dimensional vectors
 EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+# The embedding model is exported to ONNX and dynamically quantized to INT8
+# once, then loaded from this folder on every later start.
+# "avx512_vnni" targets the INT8 dot-product instructions on modern x86 CPUs
+# (the quantized model still runs on CPUs without them, just less quickly).
+EMBEDDING_ONNX_DIR = FAISS_INDEX_DIR / "onnx-int8"
+EMBEDDING_QUANTIZATION_CONFIG = "avx512_vnni"
+
+# How many chunks are embedded per forward pass.
+# Larger batches keep the CPU matmul units busier (32 was the old default).
+EMBEDDING_BATCH_SIZE = 128
+
+# Query-side static embeddings (model2vec): MiniLM distilled into a token
+# lookup table + mean pooling, used only to embed short user questions.
+# Documents are always embedded with the full MiniLM model.
+# The static model is only used if its vectors agree with MiniLM's on a
+# held-out question set (mean cosine >= QUERY_STATIC_MIN_COSINE); otherwise
+# queries keep going through MiniLM.
+QUERY_STATIC_MODEL_DIR = FAISS_INDEX_DIR / "model2vec"
+QUERY_STATIC_MIN_COSINE = 0.85
+
+# Micro-batching: concurrent embed/generate calls that arrive within
+# BATCH_MAX_WAIT_MS of each other are run as one batch (up to BATCH_MAX_SIZE calls)
+BATCH_MAX_SIZE = 16
+BATCH_MAX_WAIT_MS = 5
+
+# Threads PyTorch / ONNX Runtime may use for one op (matmuls etc.).
+# Half the logical CPUs ≈ the physical cores: hyperthread siblings share one
+# core's vector units, so extra GEMM threads only add contention.
+TORCH_NUM_THREADS = max(1, (os.cpu_count() or 1) // 2)
+
+# OpenMP / MKL read these when torch loads, so they are set here (config is
+# imported before any model module); explicit environment values still win
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_NUM_THREADS))
+
 # Summarization model: reads context and generates meeting minutes
 # Option 1: google/flan-t5-base (~250MB, faster, good quality)
 # Option 2: facebook/bart-large-cnn (~1.6GB, stronger summarization)
 SUMMARIZATION_MODEL_NAME = "google/flan-t5-large"
 
+# Model used when there is no GPU. flan-t5-small (~80M params) is roughly 3x
+# faster than the larger checkpoints; our prompt spells out the exact section
+# layout, so the templated minutes lose little quality. Set it to
+# SUMMARIZATION_MODEL_NAME to run the same model everywhere.
+SUMMARIZATION_MODEL_CPU = "google/flan-t5-small"
+
+# torch.compile the summarizer's forward pass (mode="reduce-overhead").
+# Cuts per-step kernel-launch overhead (on GPU it also captures each decoder
+# step as a CUDA graph), but the first generation after startup pays a
+# compile cost of tens of seconds.
+# None = on for GPU, off for CPU; True/False forces it either way.
+SUMMARIZER_TORCH_COMPILE = None
+
+# On CPU the summarizer is exported to ONNX and its encoder/decoder are
+# dynamically quantized to INT8 once with SUMMARIZER_QUANTIZATION_CONFIG
+# (an optimum AutoQuantizationConfig preset, independent of the embedding
+# model's), then run on ONNX Runtime from a per-model subfolder here.
+# The GPU path keeps the PyTorch model.
+SUMMARIZER_ONNX_DIR = FAISS_INDEX_DIR.parent / "onnx-flan-t5-int8"
+SUMMARIZER_QUANTIZATION_CONFIG = "avx512_vnni"
+
+# Generation is deterministic (greedy), so outputs are cached on disk keyed
+# by the exact prompt tokens + model; re-processing a transcript is instant.
+# Least-recently-stored entries are evicted beyond SUMMARY_CACHE_SIZE_LIMIT bytes.
+SUMMARY_CACHE_DIR = DATA_DIR / "summary_cache"
+SUMMARY_CACHE_SIZE_LIMIT = 300 * 1024 * 1024
+
+# EAGER_LOAD_MODEL=1 starts loading (and warming up) the summarizer in a
+# background thread as soon as the app is imported, so the first upload
+# doesn't wait 1-3 minutes for it
+EAGER_LOAD_MODEL = os.getenv("EAGER_LOAD_MODEL") == "1"
+
 
 # ─── Text Splitting Configuration ─────────────────────────────────────────────
-# CHUNK_SIZE: How many characters per chunk
-# Think of it like cutting a long article into paragraphs
-CHUNK_SIZE = 500
+# Chunks are measured in tokens of this tiktoken encoding
+TOKENIZER_ENCODING = "cl100k_base"
+
+# CHUNK_SIZE: How many tokens per chunk
+# Think of it like cutting a long article into paragraphs.
+# all-MiniLM-L6-v2 reads at most 256 of its own (WordPiece) tokens, and
+# WordPiece needs somewhat more tokens than cl100k_base for the same text,
+# so 200 cl100k tokens keeps each chunk inside the embedder's window.
+CHUNK_SIZE = 200
 
-# CHUNK_OVERLAP: How many characters overlap between consecutive chunks
+# CHUNK_OVERLAP: How many tokens overlap between consecutive chunks
 # This prevents important information from being cut at chunk boundaries
 # Example: "...John will lead the Q4 | campaign and report..."
 #           Without overlap, "Q4 campaign" would be split. With overlap, it appears in both chunks.
-CHUNK_OVERLAP = 50
+CHUNK_OVERLAP = 20
 
 # ─── Retrieval Configuration ──────────────────────────────────────────────────
 # How many chunks to retrieve when answering a question
 TOP_K_RESULTS = 5
 
+# Repeat questions against the same index skip embedding + search:
+# this many (question, index) results are kept in an LRU cache
+RETRIEVAL_CACHE_SIZE = 256
+
+# HNSW graph index: each vector links to HNSW_M neighbours.
+# Higher M = better recall, more memory. 32 is the usual sweet spot for 384 dims.
+EMBEDDING_DIMENSIONS = 384
+HNSW_M = 32
+
+# efConstruction: candidates kept while inserting (build time, graph quality)
+# efSearch: candidates kept while searching (query time, recall at k=5)
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Below this many chunks a brute-force scan is already sub-millisecond and
+# exact, so small transcripts get a flat index instead of an HNSW graph
+FLAT_INDEX_MAX_VECTORS = 1000
+
+# Saved indexes of past uploads (reused if the same transcript comes back).
+# Besides the current one, only the INDEX_HISTORY_SIZE most recently used
+# are kept on disk; older ones are deleted.
+INDEX_HISTORY_SIZE = 3
+
+# Above this many chunks vectors are product-quantized (IndexIVFPQ):
+# 384 dims are split into 48 sub-vectors of 8 dims, each stored as one byte,
+# so 48 bytes per chunk instead of 1536 (FP32) or 384 (SQ8 in HNSW).
+# Queries scan only the IVF_NPROBE closest of the ~4*sqrt(N) clusters.
+IVFPQ_MIN_VECTORS = 10000
+IVF_NPROBE = 16
+
 # Maximum characters passed to LLM to avoid token overflow
 MAX_CONTEXT_LENGTH = 12000
 
@@ -55,4 +158,9 @@ MAX_CONTEXT_LENGTH = 12000
 # ─── API Configuration ────────────────────────────────────────────────────────
 API_HOST = "0.0.0.0"
 API_PORT = 8000
-CORS_ORIGINS = ["*"]  # In production, replace with specific domain
\ No newline at end of file
+CORS_ORIGINS = ["*"]  # In production, replace with specific domain
+
+# ─── Logging ──────────────────────────────────────────────────────────────────
+# Per-stage progress messages are logged at DEBUG, model loading at INFO.
+# Production default is WARNING; set LOG_LEVEL=INFO or DEBUG to see more
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
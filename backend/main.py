@@ -1,19 +1,48 @@
 """
 main.py — Updated with startup event to pre-load models.
+
+Run from the project root (backend is imported as a package):
+    python -m backend.main
+    # or: uvicorn backend.main:app --reload
 """
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import queue
 import uvicorn
-import os
-import sys
 
 
-from config import API_HOST, API_PORT, CORS_ORIGINS, PROJECT_ROOT
-from routers.minutes import router as minutes_router
+from backend.config import API_HOST, API_PORT, CORS_ORIGINS, PROJECT_ROOT, LOG_LEVEL
+from backend.routers.minutes import router as minutes_router
+
+log = logging.getLogger(__name__)
+
+
+# ─── Logging ──────────────────────────────────────────────────────────────────
+def _start_log_listener() -> QueueListener:
+    """
+    Route all log records through a queue to a background thread.
+
+    Request threads only enqueue the record; formatting and the write to
+    stderr happen on the listener thread, off the request path.
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
 
 
 # ─── Lifespan: runs on startup and shutdown ────────────────────────────────────
@@ -23,17 +52,19 @@ async def lifespan(app: FastAPI):
     Runs startup code before accepting requests.
     Pre-loads ML models so the first user request isn't slow.
     """
-    print("🚀 Starting up Meeting Minutes Generator...")
+    listener = _start_log_listener()
+    log.info("🚀 Starting up Meeting Minutes Generator...")
 
     # Import here to avoid circular imports
-    # from services.rag_pipeline import rag_pipeline
+    # from backend.services.rag_pipeline import rag_pipeline
     # rag_pipeline.initialize()
 
-    print("✅ Server ready to accept requests")
+    log.info("✅ Server ready to accept requests")
     yield  # <-- Server runs here
 
     # Shutdown code (if needed)
-    print("👋 Shutting down...")
+    log.info("👋 Shutting down...")
+    listener.stop()  # flushes any queued records
 
 
 # ─── Create FastAPI App ────────────────────────────────────────────────────────
@@ -42,6 +73,9 @@ app = FastAPI(
     description="Automated meeting minutes using RAG pipeline with LangChain",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes the (often multi-KB) minutes payload much faster
+    # than the stdlib json encoder behind the default JSONResponse
+    default_response_class=ORJSONResponse,
 )
 
 # ─── CORS ─────────────────────────────────────────────────────────────────────
@@ -73,4 +107,4 @@ async def health_check():
 
 # ─── Run ──────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    uvicorn.run("main:app", host=API_HOST, port=API_PORT, reload=True)
\ No newline at end of file
+    uvicorn.run("backend.main:app", host=API_HOST, port=API_PORT, reload=True)
\ No newline at end of file
@@ -16,14 +16,18 @@ Each gets its own router file.
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+import aiofiles
+import asyncio
+import logging
 import os
-import sys
 import shutil
+import uuid
 
-from config import TRANSCRIPTS_DIR
-from services.rag_pipeline import rag_pipeline
+from backend.config import TRANSCRIPTS_DIR
+from backend.services.rag_pipeline import rag_pipeline
+
+log = logging.getLogger(__name__)
 
 # Create router
 router = APIRouter()
@@ -87,7 +91,7 @@ async def upload_transcript(file: UploadFile = File(...)):
     How file upload works in FastAPI:
     1. Browser sends multipart/form-data POST request with file data
     2. FastAPI receives it as UploadFile object
-    3. We save it to disk
+    3. We stream it to disk in small pieces
     4. We pass the file path to our RAG pipeline
     5. RAG pipeline processes it and returns minutes
 
@@ -107,40 +111,53 @@ async def upload_transcript(file: UploadFile = File(...)):
             detail=f"Invalid file type '{file_extension}'. Only .txt and .md files are supported."
         )
 
-    # ── Validate file size (max 5MB) ──────────────────────────────────────
+    # ── Stream file to disk, validating size as we go (max 5MB) ─────────
+    # Reading in 256KB pieces keeps only one piece in memory at a time
+    # instead of the whole upload, and we stop as soon as the limit is hit.
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB in bytes
-    content = await file.read()
-    await file.close()
+    UPLOAD_CHUNK_SIZE = 256 * 1024   # 256KB per read
 
+    # Sanitize filename to prevent path traversal attacks
+    safe_filename = os.path.basename(file.filename)
+    file_path = TRANSCRIPTS_DIR / safe_filename
+    # Write to a temporary name so a rejected upload never clobbers an existing file;
+    # the random suffix keeps concurrent uploads of the same filename apart
+    partial_path = file_path.with_name(f"{safe_filename}.{uuid.uuid4().hex}.part")
+
+    total_bytes = 0
+    async with aiofiles.open(partial_path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_bytes += len(chunk)
+            if total_bytes > MAX_FILE_SIZE:
+                break
+            await out.write(chunk)
+    await file.close()
 
-    if len(content) > MAX_FILE_SIZE:
+    if total_bytes > MAX_FILE_SIZE:
+        os.remove(partial_path)
         raise HTTPException(
             status_code=400,
-            detail=f"File too large ({len(content) / 1024 / 1024:.1f}MB). Maximum size is 5MB."
+            detail="File too large. Maximum size is 5MB."
         )
 
-    if len(content) < 100:
+    if total_bytes < 100:
+        os.remove(partial_path)
         raise HTTPException(
             status_code=400,
             detail="File is too small. Please upload a real meeting transcript (minimum 100 characters)."
         )
 
-    # ── Save file to disk ─────────────────────────────────────────────────
-    # Sanitize filename to prevent path traversal attacks
-    safe_filename = os.path.basename(file.filename)
-    file_path = TRANSCRIPTS_DIR / safe_filename
-
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    print(f"📁 Saved transcript: {file_path} ({len(content)} bytes)")
+    os.replace(partial_path, file_path)
+    log.info("📁 Saved transcript: %s (%d bytes)", file_path, total_bytes)
 
     # ── Ensure pipeline is initialized ────────────────────────────────────
+    # Model loading and the pipeline are CPU-bound and blocking, so they run
+    # in a worker thread; the event loop stays free to serve other requests
     if not rag_pipeline._is_initialized:
-        rag_pipeline.initialize()
+        await asyncio.to_thread(rag_pipeline.initialize)
 
     # ── Run RAG Pipeline ──────────────────────────────────────────────────
-    result = rag_pipeline.process_transcript(str(file_path))
+    result = await asyncio.to_thread(rag_pipeline.process_transcript, str(file_path))
 
     # ── Handle errors ─────────────────────────────────────────────────────
     if result["status"] == "error":
@@ -150,16 +167,15 @@ async def upload_transcript(file: UploadFile = File(...)):
         )
 
     # ── Return successful response ────────────────────────────────────────
-    return JSONResponse(
-        content={
-            "status": "success",
-            "filename": safe_filename,
-            "minutes": result["minutes"],
-            "chunks_created": result["chunks_created"],
-            "sections_retrieved": result["sections_retrieved"],
-            "processing_time_seconds": result["processing_time_seconds"],
-        }
-    )
+    # Plain dicts are serialized by the app's default ORJSONResponse
+    return {
+        "status": "success",
+        "filename": safe_filename,
+        "minutes": result["minutes"],
+        "chunks_created": result["chunks_created"],
+        "sections_retrieved": result["sections_retrieved"],
+        "processing_time_seconds": result["processing_time_seconds"],
+    }
 
 
 @router.post("/query")
@@ -182,11 +198,11 @@ async def query_transcript(request: QueryRequest):
         raise HTTPException(status_code=400, detail="Question cannot be empty.")
 
     if not rag_pipeline._is_initialized:
-        rag_pipeline.initialize()
+        await asyncio.to_thread(rag_pipeline.initialize)
 
-    result = rag_pipeline.query_transcript(request.question)
+    result = await asyncio.to_thread(rag_pipeline.query_transcript, request.question)
 
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result.get("error"))
 
-    return JSONResponse(content=result)
\ No newline at end of file
+    return result
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""
+batcher.py — Merges concurrent model calls into one batched forward pass.
+
+Why batch?
+Transformer forward passes are matrix multiplications. Running 8 requests
+one after another leaves most of the CPU/GPU matmul lanes idle; running them
+as one batch of 8 costs little more than a single request.
+
+How it works:
+- Callers (request threads) call submit(item) and block until their result is ready
+- One background worker thread takes the first waiting item, then keeps
+  collecting more for up to max_wait_ms (or until max_batch_size items)
+- It runs batch_fn once on the whole batch and hands each caller its result
+
+A single process-wide worker per model also means the weights are loaded
+only once, no matter how many requests are in flight.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, List
+import queue
+import threading
+import time
+
+
+class MicroBatcher:
+    """
+    Collects calls from many threads and runs them through batch_fn together.
+
+    batch_fn receives a list of items and must return a list of results
+    in the same order.
+
+    Usage:
+        batcher = MicroBatcher(lambda prompts: llm.batch(prompts))
+        answer = batcher.submit(prompt)  # blocks until the batch has run
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result (re-raises batch_fn errors)."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _ensure_worker(self):
+        # Start the worker lazily, exactly once
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            # Block until there is work, then gather a batch for max_wait
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = list(self._batch_fn(items))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"batch_fn returned {len(results)} results for {len(batch)} items"
+                    )
+            except BaseException as e:
+                # Fail every caller in the batch (none may be left waiting
+                # forever) and keep the worker alive for later batches
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
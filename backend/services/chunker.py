@@ -1,20 +1,108 @@
 """
 chunker.py — Handles loading and splitting of transcript text.
 
-Key LangChain concepts used:
-- RecursiveCharacterTextSplitter: Smart text splitter that tries to split
-  at natural boundaries (paragraphs → sentences → words → characters)
-  in that order, preserving semantic coherence.
+Why split by tokens instead of characters?
+Models read tokens, not characters. Measuring chunks in tokens (with
+tiktoken's cl100k_base encoding) makes every chunk carry about the same
+amount of model input, so we need fewer chunks — and fewer embedding passes —
+for the same coverage than with fixed 500-character chunks.
+
+How TokenWindowSplitter works:
+1. Tokenize the whole transcript once (tiktoken runs in Rust)
+2. Find "break" tokens — ones containing a newline or ending a sentence
+3. Greedily pack windows of ≤CHUNK_SIZE tokens that end on a break when
+   possible, with CHUNK_OVERLAP tokens shared between consecutive windows
+4. Decode each window back to text
+
+Steps 2-3 run on NumPy arrays, so even 5MB transcripts split quickly.
 """
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from typing import List
-import sys
+from typing import List, Tuple
+import logging
+import numpy as np
+import tiktoken
 import os
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import CHUNK_SIZE, CHUNK_OVERLAP
+from backend.config import CHUNK_SIZE, CHUNK_OVERLAP, TOKENIZER_ENCODING
+
+log = logging.getLogger(__name__)
+
+
+class TokenWindowSplitter:
+    """
+    Splits text into overlapping windows of at most chunk_size tokens.
+
+    Usage:
+        splitter = TokenWindowSplitter("cl100k_base", chunk_size=200, chunk_overlap=20)
+        for text, token_count in splitter.split_text(transcript):
+            ...
+    """
+
+    def __init__(self, encoding_name: str, chunk_size: int, chunk_overlap: int):
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._break_ids = self._find_break_tokens()
+
+    def _find_break_tokens(self) -> np.ndarray:
+        """Ids of tokens after which a chunk may end (newline or sentence end)."""
+        break_ids = []
+        for token_id in range(self.encoding.n_vocab):
+            try:
+                token = self.encoding.decode_single_token_bytes(token_id)
+            except KeyError:
+                continue  # unused id in the vocabulary
+            if b"\n" in token or token.rstrip().endswith((b".", b"?", b"!")):
+                break_ids.append(token_id)
+        return np.asarray(break_ids, dtype=np.int64)
+
+    def split_text(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Split text into chunks.
+
+        Returns:
+            List of (chunk_text, token_count) pairs
+        """
+        tokens = np.asarray(self.encoding.encode_ordinary(text), dtype=np.int64)
+        n = len(tokens)
+
+        # A boundary is the token position just past a break token
+        boundaries = np.flatnonzero(np.isin(tokens, self._break_ids)) + 1
+
+        spans = []
+        start = 0
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= n:
+                end = n
+            else:
+                # Last boundary in (start, limit], else a hard cut at the limit
+                j = np.searchsorted(boundaries, limit, side="right") - 1
+                end = int(boundaries[j]) if j >= 0 and boundaries[j] > start else limit
+            spans.append((start, end))
+            if end >= n:
+                break
+            # Overlap only if the next window still moves forward; a break
+            # within chunk_overlap of start would otherwise be found again
+            start = end - self.chunk_overlap if end - self.chunk_overlap > start else end
+
+        chunks = []
+        for s, e in spans:
+            chunk = self.encoding.decode(tokens[s:e].tolist()).strip()
+            if chunk:
+                chunks.append((chunk, e - s))
+        return chunks
+
+
+# ─── Global Text Splitter ─────────────────────────────────────────────────────
+# The splitter holds no per-transcript state, so we build it once at import
+# instead of on every upload.
+_SPLITTER = TokenWindowSplitter(
+    TOKENIZER_ENCODING,
+    chunk_size=CHUNK_SIZE,          # Max tokens per chunk
+    chunk_overlap=CHUNK_OVERLAP,    # Tokens shared between consecutive chunks
+)
 
 
 def load_transcript(file_path: str) -> str:
@@ -37,7 +125,7 @@ def load_transcript(file_path: str) -> str:
         if not content.strip():
             raise ValueError("The transcript file is empty.")
 
-        print(f"✅ Loaded transcript: {len(content)} characters")
+        log.debug("✅ Loaded transcript: %d characters", len(content))
         return content
 
     except FileNotFoundError:
@@ -50,14 +138,8 @@ def split_transcript_into_chunks(text: str, source_name: str = "transcript") ->
     """
     Split a long transcript into smaller, overlapping chunks.
 
-    This function uses LangChain's RecursiveCharacterTextSplitter which:
-    1. First tries to split on double newlines (paragraphs)
-    2. Then single newlines
-    3. Then periods/sentences
-    4. Then spaces (words)
-    5. Finally individual characters (last resort)
-
-    This "recursive" approach keeps semantically related text together.
+    Chunks are at most CHUNK_SIZE tokens and end on a line or sentence
+    boundary whenever one fits, which keeps related text together.
 
     Args:
         text: The full transcript text
@@ -68,40 +150,33 @@ def split_transcript_into_chunks(text: str, source_name: str = "transcript") ->
 
     Each Document has:
         - doc.page_content: The actual chunk text
-        - doc.metadata: Dictionary with source, chunk_index, chunk_size
+        - doc.metadata: Dictionary with source, chunk_index, chunk_size,
+          token_count (for token-budget-aware retrieval)
     """
 
-    # Initialize the text splitter
-    # separators: ordered list of strings to split on
-    # The splitter tries each separator in order until chunks are small enough
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,          # Max characters per chunk
-        chunk_overlap=CHUNK_OVERLAP,    # Characters shared between consecutive chunks
-        length_function=len,            # How to measure length (character count)
-        separators=["\n\n", "\n", ". ", " ", ""],  # Priority order for splitting
-    )
-
     # Split the text into chunks
     # Each chunk becomes a LangChain Document object
-    raw_chunks = splitter.split_text(text)
+    raw_chunks = _SPLITTER.split_text(text)
 
     # Wrap each chunk in a Document object with metadata
     # Metadata helps us track where each chunk came from
     documents = []
-    for i, chunk in enumerate(raw_chunks):
+    for i, (chunk, token_count) in enumerate(raw_chunks):
         doc = Document(
             page_content=chunk,
             metadata={
                 "source": source_name,
                 "chunk_index": i,
                 "chunk_size": len(chunk),
+                "token_count": token_count,
                 "total_chunks": len(raw_chunks),
             }
         )
         documents.append(doc)
 
-    print(f"✅ Split into {len(documents)} chunks")
-    print(f"   Average chunk size: {sum(len(d.page_content) for d in documents) // len(documents)} characters")
+    if log.isEnabledFor(logging.DEBUG):
+        average = sum(len(d.page_content) for d in documents) // max(len(documents), 1)
+        log.debug("✅ Split into %d chunks (average %d characters)", len(documents), average)
 
     return documents
 
@@ -9,16 +9,43 @@ The model we use (all-MiniLM-L6-v2):
 - Output: 384-dimensional vector (list of 384 floats)
 - Size: ~90MB (downloads automatically on first run)
 - Speed: Fast enough to run on CPU
+
+For short user questions we can optionally use a model2vec static model
+distilled from MiniLM (see get_query_embeddings_model).
 """
 
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
 from typing import List
-import sys
-import os
+import logging
+import numpy as np
+import torch
+
+from backend.config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_QUANTIZATION_CONFIG,
+    EMBEDDING_BATCH_SIZE,
+    TORCH_NUM_THREADS,
+    QUERY_STATIC_MODEL_DIR,
+    QUERY_STATIC_MIN_COSINE,
+    BATCH_MAX_SIZE,
+    BATCH_MAX_WAIT_MS,
+)
+from backend.services.batcher import MicroBatcher
+
+log = logging.getLogger(__name__)
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import EMBEDDING_MODEL_NAME
+# One thread per physical core for the PyTorch path (shared by the summarizer)
+torch.set_num_threads(TORCH_NUM_THREADS)
+# Our model calls are sequential, so one inter-op thread is enough and stops
+# a second pool from competing with the intra-op threads for cores.
+# It can only be set before PyTorch starts any parallel work.
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    pass
 
 
 # ─── Global Embeddings Instance ───────────────────────────────────────────────
@@ -27,51 +54,273 @@ from config import EMBEDDING_MODEL_NAME
 # the API becomes painfully slow.
 _embeddings_model = None
 
+# model2vec static model for query embedding.
+# None = not loaded yet, False = rejected by validation (use MiniLM instead)
+_query_model = None
+_query_embeddings_model = None
+
+# Held-out meeting questions used to check that static query vectors land
+# close enough to MiniLM's to be searched against MiniLM document vectors
+_QUERY_VALIDATION_SET = [
+    "Who is responsible for the marketing campaign?",
+    "What was decided about the launch date?",
+    "List all deadlines mentioned",
+    "When is the next meeting?",
+    "What are the action items?",
+    "Which budget concerns were raised?",
+    "Who attended the meeting?",
+    "What is the status of the product roadmap?",
+]
+
+# Normalize vectors to unit length.
+# Normalization makes cosine similarity = dot product,
+# which makes comparison faster and more accurate
+ENCODE_KWARGS = {
+    "normalize_embeddings": True,
+    "batch_size": EMBEDDING_BATCH_SIZE,
+}
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """
+    LangChain embeddings adapter around a SentenceTransformer model
+    (INT8 ONNX on CPU, FP16 PyTorch on GPU, FP32 PyTorch as a fallback).
+
+    FAISS and the retriever only need embed_documents / embed_query,
+    so this thin wrapper calls SentenceTransformer.encode directly
+    with our batch size, normalization and inference mode.
+    Our own code uses embed_array, which returns the float32 matrix as-is
+    instead of converting it to lists of Python floats and back.
+
+    Concurrent calls (e.g. several users' questions) go through a
+    MicroBatcher, so they share one encode() call.
+
+    backend names the model variant ("onnx-int8-avx512_vnni", "cuda-fp16",
+    "cpu-fp32"): their vectors differ slightly, so saved indexes record it.
+    """
+
+    def __init__(self, model, encode_kwargs: dict, backend: str):
+        self.model = model
+        self.encode_kwargs = encode_kwargs
+        self.backend = backend
+        self._batcher = MicroBatcher(self._encode_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+
+    def _encode_batch(self, text_lists: List[List[str]]) -> List[np.ndarray]:
+        # Flatten every caller's texts into one encode() call, then split back
+        texts = [text for text_list in text_lists for text in text_list]
+        # inference_mode skips autograd bookkeeping entirely
+        with torch.inference_mode():
+            vectors = self.model.encode(texts, convert_to_numpy=True, **self.encode_kwargs)
+        # FAISS wants float32 (the FP16 GPU model returns float16)
+        vectors = vectors.astype(np.float32, copy=False)
+
+        results, start = [], 0
+        for text_list in text_lists:
+            results.append(vectors[start:start + len(text_list)])
+            start += len(text_list)
+        return results
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), 384) float32 array of unit vectors."""
+        return self._batcher.submit(texts)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
 
-def get_embeddings_model() -> HuggingFaceEmbeddings:
+def _load_quantized_model():
     """
-    Load and return the HuggingFace embeddings model (singleton pattern).
+    Load all-MiniLM-L6-v2 as a dynamically quantized INT8 ONNX model.
 
-    The first call downloads the model (~90MB) and loads it into memory.
+    The first call exports the model to ONNX and quantizes its linear layers
+    into EMBEDDING_ONNX_DIR; later calls load the quantized file directly.
+    INT8 MatMuls run 2-4x faster than FP32 on CPU and the file is ~2x smaller.
+    """
+    file_name = f"onnx/model_qint8_{EMBEDDING_QUANTIZATION_CONFIG}.onnx"
+
+    if not (EMBEDDING_ONNX_DIR / file_name).exists():
+        log.info("Exporting INT8 ONNX model to %s (one-time operation)", EMBEDDING_ONNX_DIR)
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx", device="cpu")
+        model.save(str(EMBEDDING_ONNX_DIR))
+        export_dynamic_quantized_onnx_model(
+            model, EMBEDDING_QUANTIZATION_CONFIG, str(EMBEDDING_ONNX_DIR)
+        )
+
+    return SentenceTransformer(
+        str(EMBEDDING_ONNX_DIR),
+        backend="onnx",
+        device="cpu",
+        model_kwargs={"file_name": file_name},
+    )
+
+
+def _load_fp16_cuda_model():
+    """
+    Load all-MiniLM-L6-v2 on the GPU with FP16 weights.
+
+    INT8 ONNX kernels only pay off on CPU; on a GPU, half precision
+    halves weight memory traffic and runs on the tensor cores.
+    """
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cuda")
+    model.half()
+    return model
+
+
+def _load_cpu_embeddings() -> Embeddings:
+    """Prefer the INT8 ONNX model on CPU, falling back to FP32 PyTorch."""
+    try:
+        embeddings = SentenceTransformerEmbeddings(
+            _load_quantized_model(), ENCODE_KWARGS, f"onnx-int8-{EMBEDDING_QUANTIZATION_CONFIG}"
+        )
+        log.info("Running INT8 ONNX Runtime backend")
+        return embeddings
+    except Exception as e:
+        # ONNX export needs optimum + onnxruntime — fall back to FP32 PyTorch
+        log.warning("INT8 ONNX backend unavailable (%s) — using FP32 model", e)
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+        return SentenceTransformerEmbeddings(model, ENCODE_KWARGS, "cpu-fp32")
+
+
+def get_embeddings_model() -> Embeddings:
+    """
+    Load and return the embeddings model (singleton pattern).
+
+    The first call downloads the model (~90MB), quantizes it to INT8
+    and loads it into memory.
     Subsequent calls return the already-loaded model instantly.
 
     Returns:
-        HuggingFaceEmbeddings instance ready to convert text to vectors
+        LangChain Embeddings instance ready to convert text to vectors
     """
     global _embeddings_model
 
     if _embeddings_model is None:
-        print(f"⏳ Loading embedding model: {EMBEDDING_MODEL_NAME}")
-        print("   (First run downloads ~90MB — this is a one-time operation)")
-
-        _embeddings_model = HuggingFaceEmbeddings(
-            model_name=EMBEDDING_MODEL_NAME,
-
-            # model_kwargs: passed directly to the underlying HuggingFace model
-            model_kwargs={
-                "device": "cpu",
-                "trust_remote_code": False  # Use CPU (change to "cuda" if you have a GPU)
-            },
-
-            # encode_kwargs: controls how text is converted to vectors
-            encode_kwargs={
-                "normalize_embeddings": True,
-                "batch_size": 32  # Normalize vectors to unit length
-                # Normalization makes cosine similarity = dot product,
-                # which makes comparison faster and more accurate
-            }
-        )
-        print(f"✅ Embedding model loaded successfully")
-        print(f"   Embedding dimensions: 384")
+        log.info("⏳ Loading embedding model: %s", EMBEDDING_MODEL_NAME)
+        log.info("(First run downloads ~90MB — this is a one-time operation)")
+
+        if torch.cuda.is_available():
+            _embeddings_model = SentenceTransformerEmbeddings(_load_fp16_cuda_model(), ENCODE_KWARGS, "cuda-fp16")
+            log.info("Running FP16 on GPU")
+        else:
+            _embeddings_model = _load_cpu_embeddings()
+        log.info("✅ Embedding model loaded successfully (384 dimensions)")
 
     return _embeddings_model
 
 
+def _load_static_query_model():
+    """
+    Load (or distill on first run) the model2vec static version of MiniLM.
+
+    Distillation passes MiniLM's vocabulary through the model once and keeps
+    the output vector per token; encoding is then a table lookup + mean pool.
+    pca_dims=None keeps the 384 dimensions of the document vectors.
+    """
+    from model2vec import StaticModel
+
+    if (QUERY_STATIC_MODEL_DIR / "config.json").exists():
+        return StaticModel.from_pretrained(str(QUERY_STATIC_MODEL_DIR))
+
+    from model2vec.distill import distill
+
+    log.info("Distilling static query model to %s (one-time operation)", QUERY_STATIC_MODEL_DIR)
+    model = distill(model_name=EMBEDDING_MODEL_NAME, pca_dims=None)
+    model.save_pretrained(str(QUERY_STATIC_MODEL_DIR))
+    return model
+
+
+def _encode_static(model, texts: List[str]) -> np.ndarray:
+    """Encode with the static model and L2-normalize, like MiniLM's output."""
+    vectors = np.asarray(model.encode(texts), dtype="float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+
+
+def load_query_model():
+    """
+    Load the static query model and validate it against MiniLM (singleton).
+
+    The static model only replaces MiniLM for queries if the mean cosine
+    similarity between the two models' vectors on _QUERY_VALIDATION_SET
+    reaches QUERY_STATIC_MIN_COSINE. Otherwise queries stay on MiniLM, so
+    retrieval quality never silently degrades.
+
+    Returns:
+        The model2vec StaticModel, or None if it is unavailable or rejected
+    """
+    global _query_model
+
+    if _query_model is None:
+        log.info("⏳ Loading static query embedding model...")
+        try:
+            model = _load_static_query_model()
+            static_vecs = _encode_static(model, _QUERY_VALIDATION_SET)
+            reference_vecs = get_embeddings_model().embed_array(_QUERY_VALIDATION_SET)
+            agreement = float(np.mean(np.sum(static_vecs * reference_vecs, axis=1)))
+
+            if agreement >= QUERY_STATIC_MIN_COSINE:
+                _query_model = model
+                log.info("✅ Static query model enabled (mean cosine vs MiniLM: %.3f)", agreement)
+            else:
+                _query_model = False
+                log.warning("Static query model rejected (mean cosine vs MiniLM: %.3f < %s) — queries use MiniLM",
+                            agreement, QUERY_STATIC_MIN_COSINE)
+        except Exception as e:
+            _query_model = False
+            log.warning("Static query model unavailable (%s) — queries use MiniLM", e)
+
+    return _query_model or None
+
+
+class StaticQueryEmbeddings(Embeddings):
+    """
+    LangChain embeddings adapter around the model2vec static query model.
+
+    Same interface as SentenceTransformerEmbeddings (including embed_array),
+    so callers don't need to know which model embeds their questions.
+    Encoding is a table lookup, so there is nothing to micro-batch.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        return _encode_static(self.model, texts)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def get_query_embeddings_model() -> Embeddings:
+    """
+    Return the embeddings model for user questions (singleton pattern).
+
+    The static model2vec table lookup (<1ms) when it passed validation,
+    otherwise the regular MiniLM model. Either way the vectors are in the
+    same space as the document vectors.
+    """
+    global _query_embeddings_model
+
+    if _query_embeddings_model is None:
+        model = load_query_model()
+        if model is None:
+            _query_embeddings_model = get_embeddings_model()
+        else:
+            _query_embeddings_model = StaticQueryEmbeddings(model)
+
+    return _query_embeddings_model
+
+
 def embed_text(text: str) -> List[float]:
     """
-    Convert a single text string to a vector embedding.
+    Convert a single text string to a vector embedding with MiniLM.
 
-    This is used to embed a user's question before searching FAISS.
+    (User questions go through get_query_embeddings_model instead.)
 
     Args:
         text: Any text string
@@ -106,9 +355,8 @@ def embed_documents(documents: List[Document]) -> tuple:
     model = get_embeddings_model()
     texts = [doc.page_content for doc in documents]
 
-    print(f"⏳ Generating embeddings for {len(texts)} chunks...")
+    log.debug("⏳ Generating embeddings for %d chunks...", len(texts))
     vectors = model.embed_documents(texts)
-    print(f"✅ Generated {len(vectors)} embeddings")
-    print(f"   Vector shape: each vector has {len(vectors[0])} dimensions")
+    log.debug("✅ Generated %d embeddings of %d dimensions", len(vectors), len(vectors[0]))
 
     return documents, vectors
\ No newline at end of file
@@ -14,20 +14,67 @@ We implement this as a class to maintain state between calls
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from typing import List, Dict, Optional
-import os
-import sys
+import logging
+import numpy as np
+import xxhash
+import io
+import threading
 import time
 
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import FAISS_INDEX_DIR
+from backend.config import FAISS_INDEX_DIR, MAX_CONTEXT_LENGTH, TOP_K_RESULTS
+
+from backend.services.chunker import process_transcript_file, split_transcript_into_chunks
+from backend.services.embedder import get_embeddings_model, get_query_embeddings_model
+from backend.services.vector_store import create_vector_store, load_vector_store, search_by_vectors, FAISS_INDEX_PATH
+from backend.services.retriever import create_retriever, retrieve_context
+from backend.services.summarizer import load_summarization_model, generate_summary
+
+log = logging.getLogger(__name__)
+
+# What process_transcript asks the summarizer for (the fixed prompt template
+# itself lives in summarizer.py)
+_GENERATION_QUERY = """
+Generate professional meeting minutes using this exact structure:
+
+Meeting Overview:
+Brief overview of meeting purpose.
+
+Key Decisions:
+Bullet points of major decisions.
+
+Action Items:
+List action items with owner and deadline if available.
+
+Discussion Summary:
+Key discussion points summarized clearly.
+
+Next Steps:
+Future actions and plans.
+
+Write clearly and professionally.
+"""
+
+# Placed between retrieved chunks in the LLM context
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+
+def _build_context(chunks: List[str], budget: int = MAX_CONTEXT_LENGTH) -> str:
+    """
+    Join chunks with CONTEXT_SEPARATOR, stopping once `budget` characters are written.
+
+    Gives the same result as joining everything and slicing to `budget`,
+    without building the full joined string first.
+    """
+    buf = io.StringIO()
+    for i, chunk in enumerate(chunks):
+        for piece in ((CONTEXT_SEPARATOR, chunk) if i else (chunk,)):
+            if budget <= 0:
+                return buf.getvalue()
+            buf.write(piece[:budget])
+            budget -= len(piece)
+    return buf.getvalue()
 
-from services.chunker import process_transcript_file, split_transcript_into_chunks
-from services.embedder import get_embeddings_model
-from services.vector_store import create_vector_store, load_vector_store, FAISS_INDEX_PATH
-from services.retriever import create_retriever, retrieve_context
-from services.summarizer import load_summarization_model, generate_summary
-from config import MAX_CONTEXT_LENGTH
 
 class MeetingMinutesRAGPipeline:
     """
@@ -45,11 +92,28 @@ class MeetingMinutesRAGPipeline:
         print(result["minutes"])
     """
 
+    # We use multiple targeted queries to get comprehensive context
+    # Different queries retrieve different relevant sections
+    RETRIEVAL_QUERIES = [
+        "key decisions made in the meeting",
+        "action items and assigned responsibilities",
+        "deadlines and next steps",
+        "meeting discussion summary",
+        "participants and attendees",
+        "feature roadmap and product planning",
+        "project timelines and deliverables"
+    ]
+
     def __init__(self):
         self.vector_store: Optional[FAISS] = None
         self.llm = None
         self.retriever = None
+        self.query_embedding_model = None
+        self._retrieval_query_vecs: Optional[np.ndarray] = None
         self._is_initialized = False
+        # Requests run in worker threads, so two of them can hit initialize()
+        # at once — the lock makes sure models are loaded only once
+        self._init_lock = threading.Lock()
 
     def initialize(self):
         """
@@ -58,29 +122,34 @@ class MeetingMinutesRAGPipeline:
         Call this at startup so the first API request isn't slow.
         Model loading happens once; subsequent requests are fast.
         """
-        if self._is_initialized:
-            return
+        with self._init_lock:
+            if self._is_initialized:
+                return
 
-        print("🚀 Initializing RAG Pipeline...")
-        print("=" * 50)
+            log.info("🚀 Initializing RAG Pipeline...")
 
-        # Load embedding model
-        print("Step 1/2: Loading embedding model...")
-        self.embedding_model = get_embeddings_model()
+            # Load embedding model
+            log.info("Step 1/2: Loading embedding model...")
+            self.embedding_model = get_embeddings_model()
 
+            # The retrieval queries never change, so embed them once here
+            # instead of re-embedding all of them on every upload
+            self._retrieval_query_vecs = self.embedding_model.embed_array(self.RETRIEVAL_QUERIES)
 
-        # Load summarization LLM
-        print("Step 2/2: Loading summarization model...")
-        self.llm = load_summarization_model()
+            # Static model for short user questions (falls back to MiniLM)
+            self.query_embedding_model = get_query_embeddings_model()
 
-        # Try to load existing vector store from disk
-        self.vector_store = load_vector_store()
-        if self.vector_store:
-            self.retriever = create_retriever(self.vector_store)
+            # Load summarization LLM
+            log.info("Step 2/2: Loading summarization model...")
+            self.llm = load_summarization_model()
 
-        self._is_initialized = True
-        print("=" * 50)
-        print("✅ RAG Pipeline initialized and ready!")
+            # Try to load existing vector store from disk
+            self.vector_store = load_vector_store()
+            if self.vector_store:
+                self.retriever = create_retriever(self.vector_store)
+
+            self._is_initialized = True
+            log.info("✅ RAG Pipeline initialized and ready!")
 
     def process_transcript(self, file_path: str) -> Dict:
         """
@@ -102,89 +171,58 @@ class MeetingMinutesRAGPipeline:
 
         try:
             # ── Step 1: Load and Chunk ──────────────────────────────────────
-            print("\n📄 STEP 1: Processing transcript...")
+            log.debug("📄 STEP 1: Processing transcript...")
             documents = process_transcript_file(file_path)
 
             # ── Step 2: Create Vector Store ─────────────────────────────────
-            print("\n🗄️  STEP 2: Building vector store...")
-            self.vector_store = create_vector_store(documents)
+            # Kept local until the end: uploads run in worker threads, and
+            # another upload may replace self.vector_store while this one runs
+            log.debug("🗄️  STEP 2: Building vector store...")
+            vector_store = create_vector_store(documents)
 
 
             # ── Step 3: Create Retriever ─────────────────────────────────────
-            print("\n🔍 STEP 3: Setting up retriever...")
-            self.retriever = create_retriever(self.vector_store)
+            log.debug("🔍 STEP 3: Setting up retriever...")
+            retriever = create_retriever(vector_store)
 
             # ── Step 4: Retrieve Relevant Context ────────────────────────────
-            print("\n📚 STEP 4: Retrieving relevant context...")
-
-            # We use multiple targeted queries to get comprehensive context
-            # Different queries retrieve different relevant sections
-            retrieval_queries = [
-                "key decisions made in the meeting",
-                "action items and assigned responsibilities",
-                "deadlines and next steps",
-                "meeting discussion summary",
-                "participants and attendees",
-                "feature roadmap and product planning",
-                "project timelines and deliverables"
-            ]
+            log.debug("📚 STEP 4: Retrieving relevant context...")
 
+            # One batched FAISS search over all pre-embedded retrieval queries
+            results = search_by_vectors(vector_store, self._retrieval_query_vecs, TOP_K_RESULTS)
 
             # Collect context from multiple queries for comprehensive coverage
             all_contexts = []
-            seen_chunks = set()  # Avoid duplicate chunks
+            seen_chunks: set[int] = set()  # Avoid duplicate chunks
 
-            for query in retrieval_queries:
-                docs = self.retriever.invoke(query)
-                for doc in docs:
-                    # Use content as unique key to deduplicate
-                    chunk_key = doc.page_content[:100]
+            for hits in results:
+                for doc in hits:
+                    # 64-bit xxh3 fingerprint of the content as unique key to deduplicate
+                    chunk_key = xxhash.xxh3_64_intdigest(doc.page_content)
                     if chunk_key not in seen_chunks:
                         seen_chunks.add(chunk_key)
                         all_contexts.append(doc.page_content)
 
-            # Combine all unique retrieved chunks
-            combined_context = "\n\n---\n\n".join(all_contexts)
+            # Combine all unique retrieved chunks, capped at MAX_CONTEXT_LENGTH
+            combined_context = _build_context(all_contexts)
 
-            print(f"✅ Retrieved {len(all_contexts)} unique sections")
-            print(f"   Total context length: {len(combined_context)} characters")
-
-            if len(combined_context) > MAX_CONTEXT_LENGTH:
-                combined_context = combined_context[:MAX_CONTEXT_LENGTH]
+            log.debug("✅ Retrieved %d unique sections, total context length: %d characters",
+                      len(all_contexts), len(combined_context))
 
             # ── Step 5: Generate Meeting Minutes ─────────────────────────────
-            print("\n🤖 STEP 5: Generating meeting minutes with LLM...")
-
-            generation_query = """
-                Generate professional meeting minutes using this exact structure:
-
-                Meeting Overview:
-                Brief overview of meeting purpose.
+            log.debug("🤖 STEP 5: Generating meeting minutes with LLM...")
 
-                Key Decisions:
-                Bullet points of major decisions.
-
-                Action Items:
-                List action items with owner and deadline if available.
-
-                Discussion Summary:
-                Key discussion points summarized clearly.
-
-                Next Steps:
-                Future actions and plans.
-
-                Write clearly and professionally.
-                """
-
-
-            minutes = generate_summary(self.llm, combined_context, generation_query)
+            minutes = generate_summary(self.llm, combined_context, _GENERATION_QUERY)
 
             # ── Post-process and structure the output ─────────────────────────
             # If the LLM output is too short or low quality, add structure
             minutes = self._post_process_minutes(minutes, combined_context)
 
+            # Later questions go to the most recently processed transcript
+            self.vector_store, self.retriever = vector_store, retriever
+
             elapsed = time.time() - start_time
-            print(f"\n✅ Complete! Total time: {elapsed:.1f} seconds")
+            log.info("✅ Minutes generated in %.1f seconds", elapsed)
 
             return {
                 "status": "success",
@@ -195,9 +233,7 @@ class MeetingMinutesRAGPipeline:
             }
 
         except Exception as e:
-            print(f"❌ Error in RAG pipeline: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            log.exception("❌ Error in RAG pipeline: %s", e)
             return {
                 "status": "error",
                 "error": str(e),
@@ -227,7 +263,7 @@ class MeetingMinutesRAGPipeline:
 
         try:
             # Retrieve relevant context for this specific question
-            context = retrieve_context(self.retriever, query)
+            context = retrieve_context(self.vector_store, self.query_embedding_model, query)
 
             # Generate a targeted answer
             answer = generate_summary(self.llm, context, query)
@@ -272,7 +308,7 @@ class MeetingMinutesRAGPipeline:
 
         # Fallback: Return a structured version of the raw context
         # This ensures users always get useful output
-        print("⚠️  LLM output too short — using structured context extraction")
+        log.warning("LLM output too short — using structured context extraction")
         return f"""MEETING MINUTES (Extracted from Transcript)
 
 {context}
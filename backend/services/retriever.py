@@ -15,17 +15,28 @@ LangChain provides a standard Retriever interface that:
 This standardized interface is important because LangChain chains
 (like RetrievalQA) are built to work with any Retriever — so you can
 swap FAISS for Pinecone or Chroma without changing anything else.
+
+Question results are cached (LRU) per index fingerprint, so repeated or
+reloaded questions skip both the embedding and the FAISS search.
 """
 
 from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
 from langchain_core.retrievers import BaseRetriever
-from langchain_core.documents import Document
-from typing import List
-import sys
-import os
+from functools import lru_cache
+from typing import List, Tuple
+import hashlib
+import logging
+import weakref
+
+from backend.config import TOP_K_RESULTS, RETRIEVAL_CACHE_SIZE
+from backend.services.vector_store import search_by_vectors
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import TOP_K_RESULTS
+log = logging.getLogger(__name__)
+
+# Vector stores by index fingerprint, so the LRU below can be keyed on the
+# fingerprint alone. Weak references: a replaced store is freed as usual.
+_stores_by_fingerprint: "weakref.WeakValueDictionary[str, FAISS]" = weakref.WeakValueDictionary()
 
 
 def create_retriever(vector_store: FAISS) -> BaseRetriever:
@@ -52,45 +63,103 @@ def create_retriever(vector_store: FAISS) -> BaseRetriever:
         search_kwargs={"k": TOP_K_RESULTS}  # Return top 5 most relevant chunks
     )
 
-    print(f"✅ Retriever created (top-{TOP_K_RESULTS} similarity search)")
+    log.debug("✅ Retriever created (top-%d similarity search)", TOP_K_RESULTS)
     return retriever
 
 
-def retrieve_context(retriever: BaseRetriever, query: str) -> str:
+def _index_fingerprint(vector_store: FAISS) -> str:
+    """
+    Hash of the stored vectors, computed once per vector store.
+
+    Every upload or load creates a new FAISS object, so caching the hash on
+    the object means it is recomputed exactly once per index rebuild.
+    """
+    fingerprint = getattr(vector_store, "_index_fingerprint", None)
+    if fingerprint is None:
+        index = vector_store.index
+        vectors = index.reconstruct_n(0, index.ntotal)
+        fingerprint = hashlib.blake2b(vectors.tobytes(), digest_size=8).hexdigest()
+        vector_store._index_fingerprint = fingerprint
+    return fingerprint
+
+
+def _format_context(chunks) -> str:
+    """Number the retrieved chunks and join them into one context string."""
+    if not chunks:
+        return "No relevant context found in the transcript."
+
+    # Combine all retrieved chunks into one context string in a single join
+    # We add the chunk index and a separator for clarity
+    return "\n\n".join(f"[Section {i+1}]\n{chunk}" for i, chunk in enumerate(chunks))
+
+
+@lru_cache(maxsize=RETRIEVAL_CACHE_SIZE)
+def _cached_search(query_norm: str, fingerprint: str, embeddings: Embeddings) -> Tuple[str, ...]:
+    """Embed + search once per (normalized question, index); returns chunk texts."""
+    vector_store = _stores_by_fingerprint[fingerprint]
+    # Embedded once here; anything added downstream (MMR, reranking)
+    # should reuse query_vecs rather than embedding the text again
+    query_vecs = embeddings.embed_array([query_norm])
+    documents = search_by_vectors(vector_store, query_vecs, TOP_K_RESULTS)[0]
+    return tuple(doc.page_content for doc in documents)
+
+
+def retrieve_context(vector_store: FAISS, embeddings: Embeddings, query: str) -> str:
     """
-    Use the retriever to fetch relevant chunks and combine them into context.
+    Fetch relevant chunks for a user question and combine them into context.
 
-    This function retrieves relevant document chunks and combines them
-    into a single context string that will be passed to the LLM.
+    This function embeds the question once with the given query embeddings
+    model (get_query_embeddings_model: static model2vec lookup when enabled,
+    MiniLM otherwise), searches the vector store by that vector and combines
+    the chunks into a single context string that will be passed to the LLM.
+
+    Results are cached per (normalized question, index fingerprint).
+    Normalization (lowercase, collapsed whitespace) doesn't change the
+    embedding: MiniLM's tokenizer is uncased and ignores extra whitespace.
 
     Args:
-        retriever: LangChain retriever instance
+        vector_store: Populated FAISS vector store
+        embeddings: Embeddings model for questions
         query: The question or topic to retrieve context for
 
     Returns:
         Combined context string from all retrieved chunks
 
     Example:
-        context = retrieve_context(retriever, "What were the action items?")
+        context = retrieve_context(vector_store, query_embeddings, "What were the action items?")
         # Returns: "1. Sarah Chen will update... 2. Marcus will provide..."
     """
-    print(f"🔍 Retrieving context for: '{query}'")
+    log.debug("🔍 Retrieving context for: '%s'", query)
 
-    # get_relevant_documents is the standard LangChain retriever method
-    documents: List[Document] = retriever.invoke(query)
+    fingerprint = _index_fingerprint(vector_store)
+    _stores_by_fingerprint[fingerprint] = vector_store
+    chunks = _cached_search(" ".join(query.lower().split()), fingerprint, embeddings)
+    context = _format_context(chunks)
 
-    if not documents:
-        return "No relevant context found in the transcript."
+    log.debug("✅ Retrieved %d chunks, total context: %d characters", len(chunks), len(context))
+    return context
 
-    # Combine all retrieved chunks into one context string
-    # We add the chunk index and a separator for clarity
-    context_parts = []
-    for i, doc in enumerate(documents):
-        context_parts.append(
-            f"[Section {i+1}]\n{doc.page_content}"
-        )
 
-    context = "\n\n".join(context_parts)
+def retrieve_contexts(vector_store: FAISS, embeddings: Embeddings, queries: List[str]) -> List[str]:
+    """
+    Batched version of retrieve_context for several questions at once.
+
+    All questions are embedded in one embed_array call (one forward pass
+    instead of one per question) and searched with one index.search.
+
+    Args:
+        vector_store: Populated FAISS vector store
+        embeddings: Embeddings model for questions (from get_query_embeddings_model)
+        queries: The questions to retrieve context for
+
+    Returns:
+        One combined context string per question, in the same order
+    """
+    if not queries:
+        return []
+
+    log.debug("🔍 Retrieving context for %d questions", len(queries))
 
-    print(f"✅ Retrieved {len(documents)} chunks, total context: {len(context)} characters")
-    return context
\ No newline at end of file
+    query_vecs = embeddings.embed_array([" ".join(query.lower().split()) for query in queries])
+    results = search_by_vectors(vector_store, query_vecs, TOP_K_RESULTS)
+    return [_format_context([doc.page_content for doc in documents]) for documents in results]
\ No newline at end of file
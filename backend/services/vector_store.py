@@ -12,20 +12,167 @@ Flow:
 2. Embed each chunk with our embedding model
 3. Store vectors in FAISS index
 4. When querying: embed the query, find nearest vectors, return their Documents
+
+Index type (picked by corpus size, always inner-product distance):
+- Up to FLAT_INDEX_MAX_VECTORS chunks: a flat index, which compares the
+  query against every stored vector — exact, and fast at this size
+- Larger: an HNSW graph index, which walks a small-world graph and only
+  visits O(log N) vectors per query
+- Above IVFPQ_MIN_VECTORS: IVF-PQ, which clusters the vectors and only scans
+  the clusters nearest to the query, over 48-byte compressed codes
+Because our embeddings are normalized, inner product is exactly cosine similarity.
+
+HNSW vectors are stored scalar-quantized to 8 bits per dimension (IndexHNSWSQ):
+384 bytes per chunk instead of 1536, so 4x less memory to scan, with
+negligible recall loss on normalized MiniLM embeddings.
 """
 
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import hashlib
+import logging
+import numpy as np
+import faiss
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
 import os
-import sys
 
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import FAISS_INDEX_DIR
-from services.embedder import get_embeddings_model
+from backend.config import (
+    FAISS_INDEX_DIR,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_DIMENSIONS,
+    HNSW_M,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    FLAT_INDEX_MAX_VECTORS,
+    IVFPQ_MIN_VECTORS,
+    IVF_NPROBE,
+    TOP_K_RESULTS,
+    INDEX_HISTORY_SIZE,
+)
+from backend.services.embedder import get_embeddings_model
+
+log = logging.getLogger(__name__)
 
 # File names for saving/loading the FAISS index to disk
+# (same layout as LangChain's save_local: index.faiss + index.pkl in a folder).
+# Each distinct transcript gets its own folder, FAISS_INDEX_PATH + "." + a
+# fingerprint of its chunks, and CURRENT_INDEX_LINK is a symlink to the
+# folder of the latest upload.
 FAISS_INDEX_PATH = str(FAISS_INDEX_DIR / "meeting_index")
+CURRENT_INDEX_LINK = str(FAISS_INDEX_DIR / "current")
+
+# Uploads run in worker threads. This lock serializes everything that touches
+# the index folders (reuse, save, repointing CURRENT_INDEX_LINK, pruning), so
+# pruning never deletes a folder another upload is reading or writing.
+_INDEX_LOCK = threading.Lock()
+
+
+def _index_files(index_path: str) -> Tuple[str, str]:
+    """Paths of the (index.faiss, index.pkl) pair inside an index folder."""
+    return os.path.join(index_path, "index.faiss"), os.path.join(index_path, "index.pkl")
+
+
+def _index_exists(index_path: str) -> bool:
+    return all(os.path.exists(path) for path in _index_files(index_path))
+
+
+def _documents_fingerprint(documents: List[Document], embeddings) -> str:
+    """
+    Hash of everything a saved index depends on: the chunk texts (identical
+    transcripts give identical chunks), the embedding model and backend that
+    produced the vectors, and the settings that pick and build the index type.
+    """
+    settings = (
+        EMBEDDING_MODEL_NAME, embeddings.backend, EMBEDDING_DIMENSIONS,
+        FLAT_INDEX_MAX_VECTORS, IVFPQ_MIN_VECTORS, HNSW_M, HNSW_EF_CONSTRUCTION,
+    )
+    digest = hashlib.blake2b(repr(settings).encode(), digest_size=16)
+    digest.update("\x00".join(doc.page_content for doc in documents).encode())
+    return digest.hexdigest()
+
+
+def _point_current_at(index_path: str):
+    """Atomically repoint CURRENT_INDEX_LINK at index_path (symlink + os.replace)."""
+    # Unique temporary name, so concurrent writers never share a link
+    tmp_link = f"{CURRENT_INDEX_LINK}.{uuid.uuid4().hex}.tmp"
+    # Relative target, so the data folder can be moved as a whole
+    os.symlink(os.path.basename(index_path), tmp_link)
+    os.replace(tmp_link, CURRENT_INDEX_LINK)
+    # Folder mtime doubles as "last used" for _prune_old_indexes
+    os.utime(index_path)
+
+
+def _prune_old_indexes():
+    """Delete saved indexes beyond the INDEX_HISTORY_SIZE most recently used."""
+    current = os.path.realpath(CURRENT_INDEX_LINK)
+    folder = os.path.dirname(FAISS_INDEX_PATH)
+    prefix = os.path.basename(FAISS_INDEX_PATH) + "."
+    old_indexes = [
+        path for path in (os.path.join(folder, name) for name in os.listdir(folder) if name.startswith(prefix))
+        if os.path.isdir(path) and os.path.realpath(path) != current
+    ]
+    old_indexes.sort(key=os.path.getmtime, reverse=True)
+
+    # A process that still has a deleted index memory-mapped keeps reading it
+    for path in old_indexes[INDEX_HISTORY_SIZE:]:
+        log.debug("🗑️  Removing old vector store: %s", path)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _build_index(vectors: np.ndarray) -> faiss.Index:
+    """
+    Build the FAISS index for a (N, 384) float32 array of normalized vectors.
+
+    - N <= FLAT_INDEX_MAX_VECTORS: IndexFlatIP, exact brute-force search
+    - N > IVFPQ_MIN_VECTORS: IndexIVFPQ — k-means clusters (inverted lists)
+      + product-quantized codes. Training learns the cluster centroids and
+      the per-sub-vector codebooks.
+    - Otherwise: IndexHNSWSQ = HNSW graph for search + 8-bit scalar quantized
+      storage. The quantizer must be trained first: it learns each
+      dimension's value range so it can map floats to 0-255.
+    """
+    n = len(vectors)
+    if n <= FLAT_INDEX_MAX_VECTORS:
+        index = faiss.IndexFlatIP(EMBEDDING_DIMENSIONS)
+    elif n > IVFPQ_MIN_VECTORS:
+        nlist = int(4 * np.sqrt(n))
+        index = faiss.IndexIVFPQ(
+            faiss.IndexFlatIP(EMBEDDING_DIMENSIONS),  # assigns vectors to clusters
+            EMBEDDING_DIMENSIONS,
+            nlist,
+            EMBEDDING_DIMENSIONS // 8,  # sub-vectors (bytes per code)
+            8,                          # bits per sub-vector code
+            faiss.METRIC_INNER_PRODUCT,
+        )
+        index.train(vectors)
+    else:
+        index = faiss.IndexHNSWSQ(
+            EMBEDDING_DIMENSIONS, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.train(vectors)
+
+    index.add(vectors)
+    if isinstance(index, faiss.IndexIVF):
+        # Lets reconstruct() map a row id back to its code (index fingerprints)
+        index.make_direct_map()
+    return _tune_index(index)
+
+
+def _tune_index(index: faiss.Index) -> faiss.Index:
+    """Apply query-time search parameters (HNSW efSearch, IVF nprobe) to an index."""
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    if hasattr(index, "nprobe"):
+        index.nprobe = IVF_NPROBE
+    return index
 
 
 def create_vector_store(documents: List[Document]) -> FAISS:
@@ -35,9 +182,12 @@ def create_vector_store(documents: List[Document]) -> FAISS:
     This function:
     1. Gets the embedding model
     2. Embeds all document chunks (converts text → vectors)
-    3. Creates FAISS index and stores all vectors
+    3. Creates a flat or 8-bit quantized HNSW index and stores all vectors
     4. Saves the index to disk for reuse
 
+    If an index for the exact same chunks was saved before (same transcript
+    uploaded again), it is loaded from disk instead and nothing is re-embedded.
+
     Args:
         documents: List of Document objects from the text splitter
 
@@ -47,28 +197,116 @@ def create_vector_store(documents: List[Document]) -> FAISS:
     Note: First run will be slower as it embeds all chunks.
     Subsequent runs load from disk instantly.
     """
-    print(f"⏳ Creating FAISS vector store with {len(documents)} chunks...")
+    log.debug("⏳ Creating FAISS vector store with %d chunks...", len(documents))
 
     # Get the embedding model
     embeddings = get_embeddings_model()
 
-    # LangChain's FAISS.from_documents() does two things at once:
-    # 1. Embeds every document (calls embeddings.embed_documents())
-    # 2. Creates FAISS index and inserts all vectors
-    vector_store = FAISS.from_documents(
-        documents=documents,
-        embedding=embeddings
+    # Reuse the saved index of a byte-identical transcript
+    index_path = f"{FAISS_INDEX_PATH}.{_documents_fingerprint(documents, embeddings)}"
+    with _INDEX_LOCK:
+        if _index_exists(index_path):
+            log.debug("✅ Reusing saved vector store: %s", index_path)
+            vector_store = _read_vector_store(index_path, embeddings)
+            # Same chunks in the same order, but metadata (e.g. the source file
+            # name) comes from this upload — refresh it in memory and on disk
+            vector_store.docstore = InMemoryDocstore({
+                vector_store.index_to_docstore_id[i]: doc for i, doc in enumerate(documents)
+            })
+            _write_docstore(vector_store, index_path)
+            _point_current_at(index_path)
+            _prune_old_indexes()
+            return vector_store
+
+    # Embed every chunk into one (N, 384) float32 matrix — a single encode()
+    # call in EMBEDDING_BATCH_SIZE batches, handed to FAISS without a
+    # round trip through Python float lists
+    texts = [doc.page_content for doc in documents]
+    vectors = embeddings.embed_array(texts)
+
+    # Wrap our own index in LangChain's FAISS store.
+    # docstore maps an id → Document, index_to_docstore_id maps FAISS row → id
+    doc_ids = [str(uuid.uuid4()) for _ in documents]
+    vector_store = FAISS(
+        embedding_function=embeddings,
+        index=_build_index(vectors),
+        docstore=InMemoryDocstore(dict(zip(doc_ids, documents))),
+        index_to_docstore_id=dict(enumerate(doc_ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
     )
 
-    # Save the index to disk so we can load it later without re-embedding
-    os.makedirs(os.path.dirname(FAISS_INDEX_PATH), exist_ok=True)
-    vector_store.save_local(FAISS_INDEX_PATH)
-    print(f"✅ Vector store created and saved to: {FAISS_INDEX_PATH}")
-    print(f"   Total vectors stored: {len(documents)}")
+    # Save the index to disk so we can load it later without re-embedding.
+    # Embedding and building above run outside _INDEX_LOCK, so slow uploads
+    # don't hold up each other
+    with _INDEX_LOCK:
+        _save_vector_store(vector_store, index_path)
+        _point_current_at(index_path)
+        _prune_old_indexes()
+    log.debug("✅ Vector store with %d vectors saved to: %s", len(documents), index_path)
 
     return vector_store
 
 
+def _save_vector_store(vector_store: FAISS, index_path: str):
+    """
+    Write index.faiss + index.pkl into index_path atomically.
+
+    Each file is written under a unique temporary name in the same folder and
+    then os.replace()d over the old one, so a reader never sees a half-written
+    file and two writers of the same folder never share a temporary file.
+    A process that has the old index memory-mapped keeps reading the old
+    (now unlinked) file.
+    """
+    os.makedirs(index_path, exist_ok=True)
+    faiss_file, _ = _index_files(index_path)
+
+    fd, tmp_file = tempfile.mkstemp(dir=index_path, suffix=".tmp")
+    os.close(fd)  # faiss writes by path
+    try:
+        faiss.write_index(vector_store.index, tmp_file)
+        _write_docstore(vector_store, index_path)
+        os.replace(tmp_file, faiss_file)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+
+def _write_docstore(vector_store: FAISS, index_path: str):
+    """Atomically write index.pkl (docstore + FAISS row → id map)."""
+    _, pkl_file = _index_files(index_path)
+    fd, tmp_file = tempfile.mkstemp(dir=index_path, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((vector_store.docstore, vector_store.index_to_docstore_id), f)
+        os.replace(tmp_file, pkl_file)
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+
+
+def _read_vector_store(index_path: str, embeddings) -> FAISS:
+    """Open a saved index folder: unpickled docstore + memory-mapped index."""
+    faiss_file, pkl_file = _index_files(index_path)
+
+    # The docstore is a pickle — safe to load since we created the file ourselves
+    with open(pkl_file, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    # Open the index memory-mapped and read-only: the OS pages vectors in
+    # on demand instead of us reading a private copy of the whole file into
+    # RAM first. A loaded index is only ever searched — new uploads build a
+    # fresh index in RAM and persist it with _save_vector_store.
+    index = _tune_index(faiss.read_index(faiss_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY))
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+    )
+
+
 def load_vector_store() -> Optional[FAISS]:
     """
     Load an existing FAISS index from disk.
@@ -80,29 +318,71 @@ def load_vector_store() -> Optional[FAISS]:
     If the server restarts, we don't want to re-embed everything.
     The saved index contains both the vectors AND the original text,
     so we can retrieve full document chunks when searching.
+
+    The vectors are memory-mapped rather than copied into RAM, so startup
+    cost is bounded by the metadata read, not the index size.
     """
-    # Check if saved index exists
-    faiss_file = FAISS_INDEX_PATH + ".faiss"
-    pkl_file = FAISS_INDEX_PATH + ".pkl"
+    # The latest upload's folder (via the CURRENT_INDEX_LINK symlink), or the
+    # single FAISS_INDEX_PATH folder written by older versions
+    if _index_exists(CURRENT_INDEX_LINK):
+        index_path = os.path.realpath(CURRENT_INDEX_LINK)
+    elif _index_exists(FAISS_INDEX_PATH):
+        index_path = FAISS_INDEX_PATH
+    else:
+        log.info("No existing FAISS index found. Will create on first upload.")
+        return None
 
-    if not (os.path.exists(faiss_file) and os.path.exists(pkl_file)):
-        print("⚠️ No existing FAISS index found. Will create on first upload.")
+    log.info("⏳ Loading existing FAISS index from disk...")
+    vector_store = _read_vector_store(index_path, get_embeddings_model())
+
+    # Indexes saved by older versions (FAISS.from_documents) use L2 distance;
+    # wrapped as inner product their scores would read as inverted cosines
+    if vector_store.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+        log.warning("Saved FAISS index at %s uses L2 distance, not inner product — "
+                    "ignoring it; it will be rebuilt on the next upload", index_path)
         return None
 
+    log.info("✅ FAISS index loaded successfully")
+    return vector_store
 
-    print(f"⏳ Loading existing FAISS index from disk...")
-    embeddings = get_embeddings_model()
 
-    # allow_dangerous_deserialization=True is required because FAISS uses
-    # pickle format for serialization. This is safe since we created the file ourselves.
-    vector_store = FAISS.load_local(
-        FAISS_INDEX_PATH,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
+def _search_index(vector_store: FAISS, query_vecs: np.ndarray, k: int) -> List[List[Tuple[Document, float]]]:
+    """
+    One raw FAISS index.search for a (Q, 384) matrix of query vectors.
 
-    print(f"✅ FAISS index loaded successfully")
-    return vector_store
+    Goes straight to the index and the docstore mapping instead of through
+    LangChain's similarity_search layers.
+
+    Returns:
+        One list of up to k (Document, score) pairs per query, best first
+    """
+    k = min(k, vector_store.index.ntotal)
+    if k == 0:
+        return [[] for _ in range(len(query_vecs))]
+
+    # D: inner-product scores, I: index positions (-1 = no result)
+    D, I = vector_store.index.search(np.ascontiguousarray(query_vecs, dtype=np.float32), k)
+    return [
+        [
+            (vector_store.docstore.search(vector_store.index_to_docstore_id[idx]), float(score))
+            for idx, score in zip(row_ids, row_scores)
+            if idx != -1
+        ]
+        for row_ids, row_scores in zip(I, D)
+    ]
+
+
+def search_by_vectors(vector_store: FAISS, query_vecs: np.ndarray, k: int = TOP_K_RESULTS) -> List[List[Document]]:
+    """
+    Search the store for many query vectors with one raw FAISS index.search.
+
+    FAISS scores the whole (Q, 384) query matrix against the index in one
+    call instead of Q separate similarity_search_by_vector calls.
+
+    Returns:
+        One list of up to k Documents per query vector, best match first
+    """
+    return [[doc for doc, _ in hits] for hits in _search_index(vector_store, query_vecs, k)]
 
 
 def similarity_search(vector_store: FAISS, query: str, k: int = 5) -> List[Document]:
@@ -111,7 +391,8 @@ def similarity_search(vector_store: FAISS, query: str, k: int = 5) -> List[Docum
 
     How it works:
     1. The query text is embedded into a vector
-    2. FAISS computes cosine similarity between query vector and all stored vectors
+    2. FAISS compares it to the stored vectors by inner product, which equals
+       cosine similarity because all vectors are normalized to unit length
     3. Returns the k documents with highest similarity scores
 
     Args:
@@ -127,15 +408,19 @@ def similarity_search(vector_store: FAISS, query: str, k: int = 5) -> List[Docum
         for doc in results:
             print(doc.page_content)
     """
-    print(f"🔍 Searching for: '{query}'")
-
-    # similarity_search_with_score returns (Document, score) pairs
-    # Score is the cosine distance (lower = more similar for L2, higher for cosine)
-    results_with_scores = vector_store.similarity_search_with_score(query, k=k)
-
-    print(f"✅ Found {len(results_with_scores)} relevant chunks:")
-    for i, (doc, score) in enumerate(results_with_scores):
-        print(f"   Chunk {i+1}: score={score:.4f} | {doc.page_content[:80]}...")
+    log.debug("🔍 Searching for: '%s'", query)
+
+    # (Document, score) pairs straight from index.search.
+    # The index uses inner product on unit vectors, so score is the cosine
+    # similarity itself (higher = more similar, 1.0 = same direction)
+    query_vecs = vector_store.embedding_function.embed_array([query])
+    results_with_scores = _search_index(vector_store, query_vecs, k)[0]
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("✅ Found %d relevant chunks", len(results_with_scores))
+        for i, (doc, score) in enumerate(results_with_scores):
+            # %.80s truncates inside the formatter — no slice unless it's emitted
+            log.debug("Chunk %d: score=%.4f | %.80s...", i+1, score, doc.page_content)
 
     # Return just the documents (without scores)
     return [doc for doc, score in results_with_scores]
\ No newline at end of file
@@ -2,8 +2,9 @@
 helpers.py — Utility functions shared across the application.
 """
 
-import os
+from datetime import datetime
 from pathlib import Path
+import re
 
 
 def format_minutes_output(raw_text: str, filename: str) -> str:
@@ -17,7 +18,6 @@ def format_minutes_output(raw_text: str, filename: str) -> str:
     Returns:
         Formatted meeting minutes with header
     """
-    from datetime import datetime
     date_str = datetime.now().strftime("%B %d, %Y at %I:%M %p")
 
     header = f"""MEETING MINUTES
@@ -32,7 +32,6 @@ Generated: {date_str}
 
 def clean_text(text: str) -> str:
     """Remove extra whitespace and normalize line endings."""
-    import re
     # Normalize line endings
     text = text.replace('\r\n', '\n').replace('\r', '\n')
     # Remove excessive blank lines (more than 2 consecutive)
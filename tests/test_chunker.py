@@ -0,0 +1,38 @@
+"""
+Tests for TokenWindowSplitter in backend/services/chunker.py.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from backend.services.chunker import TokenWindowSplitter
+
+
+class TokenWindowSplitterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.splitter = TokenWindowSplitter("cl100k_base", chunk_size=200, chunk_overlap=20)
+
+    def test_break_near_window_start_is_not_repeated(self):
+        # The only break ("OK.\n") sits within chunk_overlap of the start, so
+        # the next window must start after it rather than rewind one token
+        chunks = self.splitter.split_text("OK.\n" + "x" * 500)
+        texts = [text for text, _ in chunks]
+
+        self.assertEqual(texts[0], "OK.")
+        self.assertNotIn("K.", texts)
+        self.assertNotIn(".", texts)
+        self.assertTrue(all(text.startswith("x") for text in texts[1:]))
+        self.assertTrue(all(count <= 200 for _, count in chunks))
+
+    def test_short_text_is_one_chunk(self):
+        chunks = self.splitter.split_text("Alice: Let's ship on Friday.")
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0][0], "Alice: Let's ship on Friday.")
+
+
+if __name__ == "__main__":
+    unittest.main()